@@ -6,22 +6,51 @@ Google Chat Incoming Webhook으로 전송하는 스크립트 (개인용).
 - 주말 운세는 토/일 2일치가 한 게시글로 올라올 수 있음 (제목에 날짜가 2개).
 - 게시글 본문은 텍스트가 아니라 이미지 2장으로 구성되는 경우가 있음.
 
-설치: pip install requests beautifulsoup4
+설치: pip install requests beautifulsoup4 lxml selectolax brotli orjson
 환경변수: GCHAT_WEBHOOK  (Google Chat에서 발급받은 웹훅 URL)
 """
+import json
 import os
+import random
 import re
+import tempfile
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, date
+from html import unescape as html_unescape
 from zoneinfo import ZoneInfo
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
 from typing import Optional, List
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer, Tag, NavigableString, CData
 import urllib.robotparser as robotparser
 
+# bs4 파서: C 기반 lxml이 html.parser보다 훨씬 빠르므로 우선 사용하고, 없으면 내장 파서로 폴백
+try:
+    import lxml  # noqa: F401  (bs4 "lxml" 트리 빌더를 쓸 수 있는지만 확인)
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# 목록 페이지의 링크 순회는 selectolax(Lexbor)가 bs4보다 훨씬 빠름. 없으면 bs4로 처리
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# 웹훅 페이로드 직렬화: orjson은 UTF-8 bytes를 바로 만들어 주므로 우선 사용, 없으면 표준 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# bs4 폴백에서 목록 페이지는 <a>만 트리로 만들도록 제한
+ANCHORS_ONLY = SoupStrainer("a")
+
 # ---------- 설정 ----------
 MK_BASE = "https://www.mk.co.kr"
 SEARCH_URL = "https://www.mk.co.kr/search?word=%EC%98%A4%EB%8A%98%EC%9D%98%20%EC%9A%B4%EC%84%B8"
@@ -32,13 +61,24 @@ ASKJIYUN_TODAY_LIST_URL = urljoin(BASE, "/today")
 # - 오늘의 운세 2025년 12월 15일 月(음력 10월 26일)
 # - 오늘의 운세 2025년 12월 13일 土(음력 10월 24일)·2025년 12월 14일 日(음력 10월 25일)
 TITLE_PREFIX = "오늘의 운세"
+# 목록 페이지 1차 필터용 첫 단어 (nbsp/공백 차이와 무관하게 파서 단계에서 거를 수 있음)
+TITLE_PREFIX_HEAD = TITLE_PREFIX.split()[0]
+# '오늘' 판단 기준 시간대
+KST = ZoneInfo("Asia/Seoul")
+# MK/askjiyun 모두 UTF-8로 응답한다. http_get은 bytes를 돌려주므로 모든 파싱/디코딩이 이 인코딩을 쓴다
+# (selectolax는 항상 UTF-8로 읽으므로, bs4와 제목 정규식도 추측하지 않고 같은 값으로 맞춤)
+HTML_ENCODING = "utf-8"
 GCHAT_WEBHOOK = os.getenv("GCHAT_WEBHOOK")
 GCHAT_THREAD_KEY = os.getenv("GCHAT_THREAD_KEY")
 GCHAT_MESSAGE_REPLY_OPTION = os.getenv("GCHAT_MESSAGE_REPLY_OPTION", "REPLY_MESSAGE_FALLBACK_TO_NEW_THREAD")
 
-# 전송 최대 길이: 너무 길면 웹훅/채널에서 문제될 수 있으므로 안전하게 자름
+# 전송 최대 길이(UTF-8 바이트): 너무 길면 웹훅/채널에서 문제될 수 있으므로 안전하게 자름
+# (제한이 바이트 기준이라 한글은 글자당 3바이트로 계산됨)
 MAX_MESSAGE_LEN = 14000
+TRUNCATED_NOTE = "\n\n(메시지가 길어 일부만 전송됩니다. 원문에서 전체 확인하세요.)"
 MAX_LIST_PAGES = 6  # 최대 몇 페이지까지 목록을 탐색할지 (1-based)
+# MK 검색 페이지는 서로 독립적이라 동시에 받아온다 (동시 요청 수)
+MK_SEARCH_WORKERS = int(os.getenv("MK_SEARCH_WORKERS", str(MAX_LIST_PAGES)))
 
 # MK는 신문 특성상 주말(토/일) 운세가 합본으로 올라오는 경우가 있습니다.
 # 이 스크립트는 "토요일에도, 일요일에도" 같은 MK 주말 이미지를 함께 보내는 것을 기본으로 합니다.
@@ -55,6 +95,11 @@ ASKJIYUN_CONNECT_TIMEOUT = float(os.getenv("ASKJIYUN_CONNECT_TIMEOUT", "30"))
 ASKJIYUN_READ_TIMEOUT = float(os.getenv("ASKJIYUN_READ_TIMEOUT", "30"))
 ASKJIYUN_RETRY = int(os.getenv("ASKJIYUN_RETRY", "5"))
 
+# robots.txt는 자주 바뀌지 않으므로 실행 간에 디스크에 캐시 (호스트별 파일, mtime 기준 TTL)
+# (같은 머신에서 반복 실행하는 로컬/cron 환경용. 매번 새 러너인 GitHub Actions에서는 항상 새로 받음)
+ROBOTS_CACHE_DIR = os.path.expanduser(os.getenv("HOROSCOPE_CACHE_DIR", "~/.cache/horoscope"))
+ROBOTS_CACHE_TTL = float(os.getenv("ROBOTS_CACHE_TTL", str(24 * 60 * 60)))  # 초
+
 # HTTP 헤더 (간단한 브라우저처럼)
 MK_HEADERS = {
     "User-Agent": ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -76,39 +121,131 @@ ASKJIYUN_HEADERS = {
     "Referer": BASE,
 }
 
+# 모든 요청이 하나의 Session을 공유해 호스트별 keep-alive 연결을 재사용 (MK/askjiyun/GChat)
+# (사이트별 헤더는 요청마다 넘긴다. GChat 웹훅에 MK Referer가 붙지 않도록 세션 기본 헤더는 두지 않음)
+# Accept-Encoding은 requests 기본값을 쓴다: gzip/deflate에 더해 brotli가 설치돼 있으면 br도 자동으로 광고하고 풀어줌
+# (직접 'br'을 넣으면 brotli가 없는 환경에서 압축된 본문을 풀지 못하므로 넣지 않음)
+SESSION = requests.Session()
+# - 재시도는 http_get이 직접 하므로 urllib3 수준 재시도는 끈다 (max_retries=0)
+# - MK 검색 페이지를 동시에 받으므로 호스트당 풀 크기는 동시 요청 수 이상으로 둔다
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(8, MK_SEARCH_WORKERS), max_retries=0)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
 
 # ---------- 유틸: robots 체크 ----------
+# 401/403 응답을 캐시 파일에 남길 때 쓰는 '전부 금지' 규칙 (RobotFileParser.disallow_all과 같은 효과)
+_ROBOTS_DISALLOW_ALL = "User-agent: *\nDisallow: /\n"
+
+
+def _robots_cache_path(base_url):
+    return os.path.join(ROBOTS_CACHE_DIR, f"robots-{urlsplit(base_url).netloc}.txt")
+
+
+def _read_robots_cache(path) -> Optional[str]:
+    """TTL 안의 캐시 파일이 있으면 내용을, 없거나 오래됐으면 None을 돌려줍니다."""
+    try:
+        if time.time() - os.path.getmtime(path) > ROBOTS_CACHE_TTL:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_robots_cache(path, body: str):
+    """임시 파일에 쓴 뒤 os.replace로 바꿔치기해 반쯤 쓰인 캐시가 읽히지 않게 합니다."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".robots-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError as e:
+        # 캐시는 최적화일 뿐이므로 쓰기 실패(읽기 전용 FS 등)는 무시하고 진행
+        logging.debug("robots.txt 캐시 저장 실패: %s", e)
+
+
+@lru_cache(maxsize=8)
+def _robots_for(base_url):
+    """호스트별 robots.txt를 파싱해 둡니다. 디스크 캐시가 신선하면 네트워크 요청을 생략합니다."""
+    rp = robotparser.RobotFileParser()
+    robots_url = urljoin(base_url, "/robots.txt")
+    rp.set_url(robots_url)
+    cache_path = _robots_cache_path(base_url)
+    body = _read_robots_cache(cache_path)
+    if body is None:
+        headers = ASKJIYUN_HEADERS if base_url == BASE else MK_HEADERS
+        resp = SESSION.get(robots_url, headers=headers, timeout=5)
+        # RobotFileParser.read()와 같은 규칙: 401/403은 전부 금지, 그 외 4xx는 전부 허용(빈 규칙)
+        if resp.status_code in (401, 403):
+            body = _ROBOTS_DISALLOW_ALL
+        elif 400 <= resp.status_code < 500:
+            body = ""
+        else:
+            resp.raise_for_status()
+            body = resp.text
+        _write_robots_cache(cache_path, body)
+    rp.parse(body.splitlines())
+    return rp
+
+
 def allowed_by_robots(url, base_url, user_agent="*"):
     try:
-        rp = robotparser.RobotFileParser()
-        robots_url = urljoin(base_url, "/robots.txt")
-        rp.set_url(robots_url)
-        rp.read()
-        return rp.can_fetch(user_agent, url)
+        return _robots_for(base_url).can_fetch(user_agent, url)
     except Exception as e:
         logging.warning("robots.txt 체크 실패: %s (계속 진행)", e)
         # robots 체크 실패 시에도 개인용으로 계속 진행하겠다면 True 반환
         return True
 
 
+def _warn_if_robots_disallowed(check) -> None:
+    """백그라운드로 돌린 allowed_by_robots 결과(Future)를 받아, 금지면 경고만 남깁니다."""
+    if not check.result():
+        logging.warning("robots.txt에서 크롤링을 금지했을 가능성이 있습니다. 계속 진행하려면 코드를 수정하세요.")
+
+
 # ---------- HTTP 요청 with retry ----------
-def http_get(url, *, headers=None, timeout=15, retry=3, backoff=1.2, backoff_factor=1.6):
+def http_get(url, *, headers=None, timeout=15, retry=3, backoff=1.0, backoff_factor=2.0, max_backoff=30.0):
     last_exc = None
     for i in range(1, retry + 1):
         try:
-            resp = requests.get(url, headers=headers or MK_HEADERS, timeout=timeout)
+            resp = SESSION.get(url, headers=headers or MK_HEADERS, timeout=timeout)
             resp.raise_for_status()
-            return resp.text
+            # 본문을 str로 디코딩하지 않고 bytes 그대로 넘겨 파서가 직접 읽게 한다
+            return resp.content
         except Exception as e:
             last_exc = e
             logging.warning("GET 실패 (%s) %s (시도 %d/%d)", url, e, i, retry)
-            time.sleep(backoff)
-            backoff *= backoff_factor
+            if i < retry:
+                # 지수 백오프 + full jitter: 동시에 실패한 요청들이 같은 박자로 재시도하지 않도록
+                time.sleep(random.uniform(0, min(backoff * backoff_factor ** (i - 1), max_backoff)))
     raise RuntimeError(f"GET 실패: {url} / {last_exc}")
 
 
+# 사이트별 요청 옵션 (http_get_cached의 site 키)
+SITE_REQUEST_OPTIONS = {
+    "mk": {"headers": MK_HEADERS, "timeout": MK_TIMEOUT, "retry": MK_RETRY},
+    "askjiyun": {
+        "headers": ASKJIYUN_HEADERS,
+        "timeout": (ASKJIYUN_CONNECT_TIMEOUT, ASKJIYUN_READ_TIMEOUT),
+        "retry": ASKJIYUN_RETRY,
+    },
+}
+
+
+@lru_cache(maxsize=32)
+def http_get_cached(url, site):
+    """같은 실행 안에서 같은 URL을 다시 받지 않도록 성공한 응답만 메모리에 캐시합니다."""
+    return http_get(url, **SITE_REQUEST_OPTIONS[site])
+
+
 # ---------- 목록에서 오늘 게시글 링크 찾기 ----------
 def _mk_search_page_url(page: int) -> str:
     if page <= 1:
@@ -121,25 +258,96 @@ def _clean_title_text(text: str) -> str:
     return (text or "").replace("\u00a0", " ").strip()
 
 
+_RE_TITLE_YMD = re.compile(r"(\d{4})년\s*(\d{1,2})월\s*(\d{1,2})일")
+
+
 def _extract_dates_from_title(title: str) -> list[date]:
     """제목에서 'YYYY년 M월 D일' 패턴을 모두 추출합니다."""
     if not title:
         return []
     out: list[date] = []
-    for y, m, d in re.findall(r"(\d{4})년\s*(\d{1,2})월\s*(\d{1,2})일", title):
+    for y, m, d in _RE_TITLE_YMD.findall(title):
         try:
             out.append(date(int(y), int(m), int(d)))
         except ValueError:
             continue
     # 순서 유지 + 중복 제거
-    seen = set()
-    uniq = []
-    for dt in out:
-        if dt in seen:
+    return list(dict.fromkeys(out))
+
+
+def _kst_today() -> date:
+    return datetime.now(KST).date()
+
+
+@lru_cache(maxsize=1)
+def _today_tokens(today: date) -> tuple[str, str]:
+    """목록 제목에서 찾을 오늘 날짜 문자열 (MK용 'YYYY년 M월 D일', askjiyun용 'M월 D일')."""
+    return f"{today.year}년 {today.month}월 {today.day}일", f"{today.month}월 {today.day}일"
+
+
+def _iter_anchors(html: bytes, href_contains: Optional[str] = None, text_contains: Optional[str] = None):
+    """목록 페이지의 <a>를 문서 순서대로 (href, 정리된 제목 텍스트)로 돌려줍니다.
+
+    텍스트 추출이 가장 비싸므로 href가 없거나 href_contains를 포함하지 않는 링크는 먼저 건너뜁니다.
+    text_contains는 공백 없는 단어만 넘기는 1차 필터이며, 정확한 제목 판정은 호출부에서 합니다.
+    """
+    if LexborHTMLParser is not None:
+        for a in LexborHTMLParser(html).css("a"):
+            href = a.attributes.get("href")
+            if not href or (href_contains and href_contains not in href):
+                continue
+            raw = a.text(separator=" ", strip=True)
+            if text_contains and text_contains not in raw:
+                continue
+            # selectolax는 빈 텍스트 노드도 구분자로 이어붙이므로 공백을 한 번 정리
+            yield href, _clean_title_text(" ".join(raw.split()))
+        return
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=ANCHORS_ONLY, from_encoding=HTML_ENCODING)
+    for a in soup.find_all("a"):
+        href = a.get("href")
+        if not href or (href_contains and href_contains not in href):
             continue
-        seen.add(dt)
-        uniq.append(dt)
-    return uniq
+        text = a.get_text(" ", strip=True)
+        if text_contains and text_contains not in text:
+            continue
+        # selectolax 경로와 같게 안쪽 공백도 하나로 정리 (어떤 패키지가 설치됐든 같은 링크를 찾도록)
+        yield href, _clean_title_text(" ".join(text.split()))
+
+
+def _iter_mk_search_pages():
+    """MK 검색 결과를 페이지 순서대로 (page, html)로 돌려줍니다. 받지 못한 페이지는 경고 후 건너뜁니다.
+
+    보통 1페이지에서 오늘 글이 나오므로 1페이지만 먼저 받고, 못 찾았을 때만 나머지 페이지를 동시에 요청합니다.
+    """
+    url = _mk_search_page_url(1)
+    logging.debug("fetching search page %d: %s", 1, url)
+    try:
+        html = http_get_cached(url, "mk")
+    except Exception as e:
+        logging.warning("검색 페이지 가져오기 실패 (page %d): %s", 1, e)
+    else:
+        yield 1, html
+    if MAX_LIST_PAGES < 2:
+        return
+
+    # 나머지 페이지는 서로 독립적이라 한 번에 보내고, 결과는 페이지 순서대로 확인한다.
+    ex = ThreadPoolExecutor(max_workers=max(1, min(MK_SEARCH_WORKERS, MAX_LIST_PAGES - 1)))
+    try:
+        futures = []
+        for page in range(2, MAX_LIST_PAGES + 1):
+            url = _mk_search_page_url(page)
+            logging.debug("fetching search page %d: %s", page, url)
+            futures.append((page, ex.submit(http_get_cached, url, "mk")))
+        for page, fut in futures:
+            try:
+                html = fut.result()
+            except Exception as e:
+                logging.warning("검색 페이지 가져오기 실패 (page %d): %s", page, e)
+                continue
+            yield page, html
+    finally:
+        # 호출부가 중간에 찾고 끝내면 기다리지 않는다 (아직 시작 안 한 요청만 취소되고, 진행 중인 요청은 끝까지 돈다)
+        ex.shutdown(wait=False, cancel_futures=True)
 
 
 def find_today_post_url():
@@ -147,87 +355,72 @@ def find_today_post_url():
 
     주말 운세처럼 날짜가 2개인 제목도 '오늘 날짜' 문자열이 포함되면 매칭됩니다.
     """
-    now = datetime.now(ZoneInfo("Asia/Seoul"))
-    today_token = f"{now.year}년 {now.month}월 {now.day}일"
-    want = re.compile(rf"{re.escape(TITLE_PREFIX)}\s+.*{re.escape(today_token)}")
-
-    fallback_links: list[str] = []
-    for page in range(1, MAX_LIST_PAGES + 1):
-        url = _mk_search_page_url(page)
-        logging.debug("fetching search page %d: %s", page, url)
-        try:
-            html = http_get(url, headers=MK_HEADERS, timeout=MK_TIMEOUT, retry=MK_RETRY)
-        except Exception as e:
-            logging.warning("검색 페이지 가져오기 실패 (page %d): %s", page, e)
-            continue
-
-        soup = BeautifulSoup(html, "html.parser")
-        anchors = soup.find_all("a")
-        for a in anchors:
-            title = _clean_title_text(a.get_text(" ", strip=True))
-            if TITLE_PREFIX not in title:
-                continue
-            href = a.get("href")
-            if not href:
+    today_token, _ = _today_tokens(_kst_today())
+
+    # 폴백용으로는 가장 먼저 나온(최신) '오늘의 운세' 링크 하나만 기억한다
+    first_link: Optional[str] = None
+    for _page, html in _iter_mk_search_pages():
+        for href, title in _iter_anchors(html, text_contains=TITLE_PREFIX_HEAD):
+            prefix_idx = title.find(TITLE_PREFIX)
+            if prefix_idx < 0:
                 continue
             post_url = urljoin(MK_BASE, href)
-            fallback_links.append(post_url)
-            if want.search(title):
+            if first_link is None:
+                first_link = post_url
+            # '오늘의 운세 ... {오늘 날짜}' (날짜가 2개인 주말 합본 제목 포함)
+            if title.find(today_token, prefix_idx + len(TITLE_PREFIX)) >= 0:
                 return post_url
 
-    if fallback_links:
-        return fallback_links[0]
+    if first_link is not None:
+        return first_link
     raise RuntimeError("검색 결과에서 '오늘의 운세' 게시글 링크를 찾지 못했습니다.")
 
 
 def find_askjiyun_today_post_url():
     """askjiyun.com /today 목록에서 오늘 날짜의 '오늘의 운세' 게시글 URL을 찾습니다."""
-    now = datetime.now(ZoneInfo("Asia/Seoul"))
-    today_token = f"{now.month}월 {now.day}일"
-    want = re.compile(rf"^{re.escape(TITLE_PREFIX)}\s*,\s*{re.escape(today_token)}\s*$")
-
-    html = http_get(
-        ASKJIYUN_TODAY_LIST_URL,
-        headers=ASKJIYUN_HEADERS,
-        timeout=(ASKJIYUN_CONNECT_TIMEOUT, ASKJIYUN_READ_TIMEOUT),
-        retry=ASKJIYUN_RETRY,
-    )
-    soup = BeautifulSoup(html, "html.parser")
+    _, today_token = _today_tokens(_kst_today())
 
-    candidates: list[tuple[str, str]] = []
-    for a in soup.find_all("a"):
-        title = _clean_title_text(a.get_text(" ", strip=True))
-        href = a.get("href")
-        if not href or "document_srl=" not in href:
-            continue
-        if TITLE_PREFIX not in title:
+    html = http_get_cached(ASKJIYUN_TODAY_LIST_URL, "askjiyun")
+    first_link: Optional[str] = None
+    for href, title in _iter_anchors(html, href_contains="document_srl=", text_contains=TITLE_PREFIX_HEAD):
+        prefix_idx = title.find(TITLE_PREFIX)
+        if prefix_idx < 0:
             continue
         post_url = urljoin(BASE, href)
-        candidates.append((title, post_url))
-        if want.search(title):
-            return post_url
+        if first_link is None:
+            first_link = post_url
+        # 제목이 정확히 '오늘의 운세, {M}월 {D}일' 인 경우 (제목은 이미 strip됨)
+        if prefix_idx == 0:
+            rest = title[len(TITLE_PREFIX):].lstrip()
+            if rest.startswith(",") and rest[1:].strip() == today_token:
+                return post_url
 
     # 폴백: 목록에서 가장 최신 '오늘의 운세' 링크를 사용
-    if candidates:
-        return candidates[0][1]
+    if first_link is not None:
+        return first_link
     raise RuntimeError("askjiyun.com 목록에서 '오늘의 운세' 게시글 링크를 찾지 못했습니다.")
 
 
-def extract_mk_images(html: str, base_url: str) -> list[str]:
-    soup = BeautifulSoup(html, "html.parser")
-    candidates = []
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+IMAGE_SKIP_TOKENS = ("logo", "icon", "sprite", "blank")
 
-    container_selectors = [
-        "article",
-        ".news_detail",
-        ".article_body",
-        ".news_cnt_detail_wrap",
-        ".view_contents",
-        "#container",
-        "body",
-    ]
+# 본문 이미지를 찾을 컨테이너 후보 (앞에 있을수록 우선)
+MK_IMAGE_CONTAINER_SELECTORS = [
+    "article",
+    ".news_detail",
+    ".article_body",
+    ".news_cnt_detail_wrap",
+    ".view_contents",
+    "#container",
+    "body",
+]
+
+
+def extract_mk_images(soup, base_url: str) -> list[str]:
+    """이미 파싱된 게시글 soup에서 본문 이미지 URL을 최대 4개까지 뽑습니다."""
+    # 우선순위 순서대로 select_one: 보통 첫 후보(article)가 문서 앞쪽에서 바로 잡혀 트리를 끝까지 훑지 않음
     container = None
-    for s in container_selectors:
+    for s in MK_IMAGE_CONTAINER_SELECTORS:
         el = soup.select_one(s)
         if el:
             container = el
@@ -235,6 +428,7 @@ def extract_mk_images(html: str, base_url: str) -> list[str]:
     if not container:
         container = soup
 
+    candidates = []
     for img in container.find_all("img"):
         src = img.get("src") or img.get("data-src") or img.get("data-original")
         if not src:
@@ -242,52 +436,159 @@ def extract_mk_images(html: str, base_url: str) -> list[str]:
         if src.startswith("data:"):
             continue
         abs_url = urljoin(base_url, src)
-        if not re.search(r"\.(png|jpe?g|webp)(\?|$)", abs_url, re.I):
+        lower = abs_url.lower()
+        if not lower.split("?", 1)[0].endswith(IMAGE_EXTS):
             continue
-        if any(token in abs_url.lower() for token in ["logo", "icon", "sprite", "blank"]):
+        if any(token in lower for token in IMAGE_SKIP_TOKENS):
             continue
         candidates.append(abs_url)
 
-    # 순서 유지 + 중복 제거
-    seen = set()
-    uniq = []
-    for u in candidates:
-        if u in seen:
-            continue
-        seen.add(u)
-        uniq.append(u)
-
-    # 운세는 보통 2장 이미지로 구성됨
-    return uniq[:4]
+    # 순서 유지 + 중복 제거, 운세는 보통 2장 이미지로 구성됨
+    return list(dict.fromkeys(candidates))[:4]
+
+
+# ---------- 본문 정리용 정규식 (모듈 로드 시 한 번만 컴파일) ----------
+_RE_PUNCT_WS = re.compile(r"\s+([.,:;?!%])")
+# parse_post는 단락을 '\n\n'으로 합친 문자열에 적용하므로 개행을 제외한 공백만 매칭
+_RE_PAR_PUNCT_WS = re.compile(r"[^\S\n]+([.,:;?!%])")
+_RE_PAR_NYEONSAENG = re.compile(r"[^\S\n]+년생")
+_RE_PAR_PCT_DOT = re.compile(r"[^\S\n]+(\d+)%[^\S\n]*\.")
+_RE_BOILERPLATE_PAR = re.compile(r"이 게시물|공유|댓글|출처")
+# 마침표 뒤 띄어쓰기: 숫자 사이의 소수점(예: 3.14)은 건드리지 않음
+_RE_PERIOD_WORD = re.compile(r"(?:(?<!\d)\.|\.(?!\d))\s*([A-Za-z0-9가-힣])")
+_RE_DIGIT_COMMA = re.compile(r"(\d)\s*,\s*(\d)")
+# 아래는 _normalize_spacing의 여러 규칙을 한 번의 탐색으로 처리하는 합성 패턴.
+# 두 규칙은 서로 겹쳐 매칭될 수 없어 한 패턴으로 합쳐도 결과가 같음
+_RE_NYEONSAENG_DATE = re.compile(
+    r"(?P<y>\d)\s+년생"  # 48 년생 -> 48년생
+    r"|(?P<m>\d+)\s*월\s*(?P<d>\d+)\s*일"  # 5 월 6 일 -> 5월 6일
+)
+# 괄호를 먼저, 꺽쇠를 나중에 처리해야 기존 규칙 순서와 결과가 같음
+_RE_PAREN_WS = re.compile(r"\s*(?P<open>\()\s*|\s*(?P<close>\))\s*")
+_RE_ANGLE_WS = re.compile(r"\s*(?P<open>〈)\s*|\s*(?P<close>〉)\s*")
+# parse_post: 탭 하나 또는 공백/탭 연속 구간을 공백 하나로 (전체 텍스트에 한 번만 적용)
+_RE_TAB_SPACE_RUNS = re.compile(r"[ \t]{2,}|\t")
+_RE_SPACE_NL_RUNS = re.compile(r"[ \t]{2,}|\n{3,}")
+_RE_MULTI_NL = re.compile(r"\n{3,}")
+# _strip_trailing_boilerplate: 한글 보일러플레이트 시작 패턴(여러 케이스 보수적으로 포함) / 텍스트 끝에 붙은 문구
+_RE_BOILERPLATE_LINE = re.compile(r"^(이 게시물|이 글|출처|공유|댓글)", re.I)
+_RE_BOILERPLATE_TAIL = re.compile(r"(?:\s|^)(이 게시물을|이 글|출처|공유|댓글)[^\n]{0,200}\s*$", re.I)
+# _format_jiyun_readable: 띠 구분(〈쥐띠〉 등)과 운세지수(…%)를 한 번에 처리
+# (운세지수 바로 뒤의 띠 구분은 기존 두 단계 치환과 같게 줄바꿈 하나로 붙임)
+_RE_JIYUN_BREAKS = re.compile(
+    r"\s*(?:(?P<zodiac>〈[^〉]+〉)|(?P<index>운세지수\s*\d+%\.?)\s*(?P<next>〈[^〉]+〉)?)"
+)
+
+
+def _nyeonsaeng_date_fixup(m: re.Match) -> str:
+    if m.group("y"):
+        return f"{m.group('y')}년생"
+    return f"{m.group('m')}월 {m.group('d')}일"
+
+
+def _bracket_fixup(m: re.Match) -> str:
+    if m.group("open"):
+        return " " + m.group("open")
+    return m.group("close") + " "
+
+
+def _space_nl_fixup(m: re.Match) -> str:
+    return "\n\n" if m.group()[0] == "\n" else " "
+
+
+def _jiyun_break_fixup(m: re.Match) -> str:
+    if m.group("zodiac"):
+        return "\n\n" + m.group("zodiac")
+    return f" {m.group('index')}\n{m.group('next') or ''}"
 
 
 # ---------- 게시글 본문 파싱 (본문 컨테이너 후보를 넓게 잡음) ----------
-def parse_post(html, debug=False):
-    soup = BeautifulSoup(html, "html.parser")
+# get_text()가 기본으로 모으는 문자열 타입 (Comment/Script 등 하위 클래스는 제외)
+_TEXT_STRING_TYPES = (NavigableString, CData)
+
+
+def _text_len_map(node, out: dict) -> None:
+    """node 아래 모든 태그의 len(get_text(" ", strip=True))를 한 번의 순회로 out[id(tag)]에 채웁니다.
+
+    (strip한 글자 수, 비어있지 않은 문자열 수)를 아래에서 위로 합산하고,
+    길이는 글자 수 + 구분자 수(문자열 수 - 1)로 계산합니다.
+    닫히지 않은 <font>/<span> 등으로 트리가 아주 깊어질 수 있어 재귀 없이 처리합니다.
+    """
+    chars: dict[int, int] = {}
+    counts: dict[int, int] = {}
+    tags = [node]
+    for el in node.descendants:
+        if isinstance(el, Tag):
+            tags.append(el)
+        elif type(el) in _TEXT_STRING_TYPES:
+            # 주석/스크립트 등은 get_text에서도 제외되므로 일반 문자열만 센다
+            stripped = el.strip()
+            if stripped:
+                pid = id(el.parent)
+                chars[pid] = chars.get(pid, 0) + len(stripped)
+                counts[pid] = counts.get(pid, 0) + 1
+    # 문서 순서의 역순이면 자식 태그가 항상 부모보다 먼저 나오므로 부모 쪽으로 합산해 올라갈 수 있음
+    for tag in reversed(tags):
+        tid = id(tag)
+        c_chars, c_count = chars.get(tid, 0), counts.get(tid, 0)
+        out[tid] = c_chars + max(c_count - 1, 0)
+        if tag is not node:
+            pid = id(tag.parent)
+            chars[pid] = chars.get(pid, 0) + c_chars
+            counts[pid] = counts.get(pid, 0) + c_count
+
+
+def _squeeze_spaces(text: str) -> str:
+    """탭을 공백으로 바꾸고 연속된 공백을 하나로 줄입니다.
+
+    라인마다 처리하지 않고 전체 텍스트에 한 번만 적용합니다. 줄 끝 공백은 어차피 라인 strip에서
+    지워지므로, 먼저 줄이고 나중에 strip해도 라인별로 처리한 것과 결과가 같습니다.
+    """
+    return _RE_TAB_SPACE_RUNS.sub(" ", text)
+
+
+# 본문에서 제거할 요소: 스크립트/스타일 등 + 공유/광고 블록
+BAD_SELECTOR = (
+    "script, style, noscript, iframe, header, footer, nav, form, "
+    "[class*='share'], [class*='social'], [class*='ad'], [id*='share'], [id*='ad']"
+)
+
+
+def parse_post(soup, debug=False, raw_html: Optional[bytes] = None):
+    """이미 파싱된 게시글 soup에서 본문 텍스트를 뽑습니다.
+
+    본문 정리 과정에서 soup의 일부 요소를 decompose하므로, 같은 soup을 다른 곳에 쓸 때는 먼저 쓰세요.
+    raw_html은 결과가 비었을 때 디버그용으로 저장할 원본입니다 (없으면 soup을 직렬화해 저장).
+    """
     # 후보 클래스/셀렉터 여러개 시도
     selectors = [
         ".xe_content", ".read_body", "article", ".board_read .rd_body", ".read", "#content"
     ]
-    candidates = []
+    # (엘리먼트, 텍스트 길이): get_text는 비싸므로 후보마다 한 번만 계산해 두고 재사용
+    candidates: list[tuple[Tag, int]] = []
     for s in selectors:
         el = soup.select_one(s)
         if el:
-            candidates.append(el)
+            n = len(el.get_text(" ", strip=True))
+            candidates.append((el, n))
             if debug:
-                logging.debug("selector matched: %s -> element text length=%d", s, len(el.get_text(" ", strip=True)))
+                logging.debug("selector matched: %s -> element text length=%d", s, n)
 
     # fallback: 본문 길이 기준으로 가장 큰 요소를 선택
     if not candidates:
         # 전체 문서에서 텍스트가 많은 블록을 골라본다
         blocks = soup.find_all(['div', 'article', 'section', 'main'], limit=30)
         if blocks:
-            candidates = blocks
+            # 블록들이 서로 중첩되므로 get_text를 블록마다 부르지 않고 문서를 한 번만 순회해 길이를 구함
+            lengths: dict[int, int] = {}
+            _text_len_map(soup, lengths)
+            candidates = [(el, lengths[id(el)]) for el in blocks]
             if debug:
                 logging.debug("fallback blocks found: %d", len(blocks))
 
     if not candidates:
         # 마지막 수단: 전체 문서 텍스트
-        text = soup.get_text("\n", strip=True)
+        text = _squeeze_spaces(soup.get_text("\n", strip=True))
         if debug:
             logging.debug("no candidates: using full document text length=%d", len(text))
         # 줄 단위로 정리: 각 라인을 strip하고 빈 줄은 연속 1개로 제한
@@ -302,20 +603,19 @@ def parse_post(html, debug=False):
                 else:
                     continue
             else:
-                # 라인 내 연속 공백은 하나로 축소
-                cleaned.append(re.sub(r"[ \t]{2,}", " ", ln))
+                # 라인 내 연속 공백은 위에서 이미 하나로 축소됨
+                cleaned.append(ln)
                 prev_blank = False
         text = "\n".join(cleaned).strip()
         return text
 
     # 가장 많은 텍스트를 가진 엘리먼트를 선택
-    body = max(candidates, key=lambda el: len(el.get_text(" ", strip=True)))
+    body, body_len = max(candidates, key=lambda c: c[1])
     if debug:
-        logging.debug("chosen body element text length=%d", len(body.get_text(" ", strip=True)))
+        logging.debug("chosen body element text length=%d", body_len)
     # 불필요한 요소(스크립트, 스타일, 공유/광고 블록 등) 제거
-    for bad in body.select("script, style, noscript, iframe, header, footer, nav, form"):
-        bad.decompose()
-    for bad in body.select("[class*='share'], [class*='social'], [class*='ad'], [id*='share'], [id*='ad']"):
+    # (합친 셀렉터로 서브트리를 한 번만 훑음. 이미 지운 요소의 자손이 함께 잡혀도 decompose는 안전)
+    for bad in body.select(BAD_SELECTOR):
         bad.decompose()
 
     if debug:
@@ -323,49 +623,37 @@ def parse_post(html, debug=False):
         logging.debug("before cleaning sample: %s", sample.replace("\n", "\\n"))
 
     # 텍스트로 변환한 뒤 라인 단위로 정리
-    text = body.get_text("\n", strip=True)
-    lines = [ln.strip() for ln in text.splitlines()]
-    cleaned = []
-    prev_blank = False
-    for ln in lines:
-        if ln == "":
-            if not prev_blank:
-                cleaned.append("")
-                prev_blank = True
-            else:
-                continue
-        else:
-            cleaned.append(re.sub(r"[ \t]{2,}", " ", ln))
-            prev_blank = False
-    # 이제 문장/단락 단위로 병합: 빈 줄은 단락 구분으로 유지
+    text = _squeeze_spaces(body.get_text("\n", strip=True))
+    # 라인 정리(strip/공백 축소)와 단락 병합을 한 번의 순회로 처리: 빈 줄은 단락 구분으로 유지
     paragraphs = []
     cur_lines = []
-    for ln in cleaned:
-        if ln == "":
+    for ln in text.splitlines():
+        ln = ln.strip()
+        if not ln:
             if cur_lines:
-                paragraphs.append(" ".join(cur_lines).strip())
+                paragraphs.append(" ".join(cur_lines))
                 cur_lines = []
             continue
         # 문장 내에서 강제 개행(문장 중간에 있는 경우)를 제거하고 이전 라인과 이어붙임
         # 단, 문장이 끝나는 경우(마침표/물음/감탄/%)에는 그대로 두어도 무방
         cur_lines.append(ln)
-
     if cur_lines:
-        paragraphs.append(" ".join(cur_lines).strip())
+        paragraphs.append(" ".join(cur_lines))
 
     # 문장 연결 시 잘못된 공백/마침표 띄어쓰기 정리
-    for i, p in enumerate(paragraphs):
-        # 숫자와 뒤따르는 '년생' 같은 패턴의 잘못된 띄어쓰기 보정
-        p = re.sub(r"\s+([.,:;?!%])", r"\1", p)
-        p = re.sub(r"\s+년생", r"년생", p)
-        # '운세지수\n93%.' 같이 잘려 있던 숫자 붙여쓰기 보정
-        p = re.sub(r"\s+(\d+)%\s*\.", r" \1%.", p)
-        paragraphs[i] = p
+    # 단락마다 돌리지 않고 한 문자열로 합쳐 한 번씩만 적용한다.
+    # (단락 안에는 개행이 없고, 패턴은 개행을 넘지 않으므로 단락별 적용과 결과가 같음)
+    joined = "\n\n".join(paragraphs)
+    # 숫자와 뒤따르는 '년생' 같은 패턴의 잘못된 띄어쓰기 보정
+    joined = _RE_PAR_PUNCT_WS.sub(r"\1", joined)
+    joined = _RE_PAR_NYEONSAENG.sub(r"년생", joined)
+    # '운세지수\n93%.' 같이 잘려 있던 숫자 붙여쓰기 보정
+    joined = _RE_PAR_PCT_DOT.sub(r" \1%.", joined)
 
     # 보일러플레이트(예: '이 게시물을 ...') 제거: 짧은 단락에만 적용
     new_pars = []
-    for p in paragraphs:
-        if len(p) < 120 and re.search(r"이 게시물|공유|댓글|출처", p):
+    for p in joined.split("\n\n") if joined else []:
+        if len(p) < 120 and _RE_BOILERPLATE_PAR.search(p):
             if debug:
                 logging.debug("dropping short boilerplate paragraph: %r", p[:120])
             continue
@@ -397,14 +685,57 @@ def parse_post(html, debug=False):
         # 디버깅을 위해 원본 HTML을 저장
         try:
             path = os.path.join(os.getcwd(), "horoscope_debug_raw.html")
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(html)
+            with open(path, "wb") as f:
+                f.write(raw_html if raw_html is not None else str(soup).encode("utf-8"))
             logging.error("parse_post produced empty text; raw HTML saved to %s", path)
         except Exception as e:
             logging.exception("failed to save debug html: %s", e)
     return text
 
 
+# 제목 태그는 문서 앞부분(<head>)에 있으므로 앞쪽만 디코딩해 정규식으로 훑는다
+TITLE_SCAN_BYTES = 8192
+_RE_OG_TITLE = re.compile(
+    r"""<meta\s[^>]*?(?:"""
+    r"""property\s*=\s*["']og:title["'][^>]*?content\s*=\s*(["'])(?P<a>.*?)\1"""
+    r"""|content\s*=\s*(["'])(?P<b>.*?)\3[^>]*?property\s*=\s*["']og:title["'])""",
+    re.I | re.S,
+)
+_RE_TITLE_TAG = re.compile(r"<title[^>]*>(.*?)</title>", re.I | re.S)
+
+
+def _extract_page_title(html: bytes, default: str, *, prefer_og: bool = False, soup=None) -> str:
+    """게시글 제목(og:title 또는 <title>)을 가져옵니다.
+
+    전체 문서를 훑지 않고 앞부분만 정규식으로 찾고, 못 찾을 때만 soup(없으면 새로 파싱)으로 폴백합니다.
+    """
+    # 잘린 멀티바이트 문자의 조각은 버림
+    head = html[:TITLE_SCAN_BYTES].decode(HTML_ENCODING, errors="ignore")
+    m = _RE_OG_TITLE.search(head) if prefer_og else None
+    if m and (m.group("a") or m.group("b") or "").strip():
+        return html_unescape(m.group("a") or m.group("b")).strip()
+    # og:title이 앞부분 밖에 있을 수도 있으면 <title>로 넘어가지 않고 bs4로 확인
+    if not (prefer_og and not m and b"og:title" in html):
+        m = _RE_TITLE_TAG.search(head)
+        if m:
+            return html_unescape(m.group(1)).strip()
+
+    if soup is None:
+        soup = BeautifulSoup(html, HTML_PARSER, from_encoding=HTML_ENCODING)
+    if prefer_og:
+        og = soup.select_one('meta[property="og:title"]')
+        if og and og.get("content") and og.get("content").strip():
+            return og.get("content").strip()
+    return soup.find("title").get_text(strip=True) if soup.find("title") else default
+
+
+def _json_bytes(obj) -> bytes:
+    """JSON을 UTF-8 bytes로 직렬화합니다 (한글은 \\uXXXX로 이스케이프하지 않음)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
 def send_to_gchat(
     message: str,
     *,
@@ -459,7 +790,13 @@ def send_to_gchat(
     )
     logging.debug("GChat payload JSON: %s", payload)
     try:
-        r = requests.post(GCHAT_WEBHOOK, params=query_params, json=payload, timeout=20)
+        r = SESSION.post(
+            GCHAT_WEBHOOK,
+            params=query_params,
+            data=_json_bytes(payload),
+            headers={"Content-Type": "application/json; charset=UTF-8"},
+            timeout=20,
+        )
     except Exception as e:
         logging.exception("GChat POST 실패: %s", e)
         raise
@@ -470,8 +807,33 @@ def send_to_gchat(
     logging.info("Google Chat 전송 성공: %d", r.status_code)
 
 
+def _truncate_utf8(text: str, max_bytes: int) -> str:
+    """UTF-8로 max_bytes를 넘으면 글자가 깨지지 않는 경계에서 자르고 안내 문구를 붙입니다."""
+    data = text.encode("utf-8")
+    if len(data) <= max_bytes:
+        return text
+    if text.endswith(TRUNCATED_NOTE):
+        # 본문 후처리 단계에서 이미 잘린 경우: 안내 문구가 두 번 붙지 않도록 떼고 다시 자름
+        data = text[: -len(TRUNCATED_NOTE)].encode("utf-8")
+    logging.warning("메시지가 너무 깁니다 (%d바이트). 자릅니다.", len(data))
+    # 잘린 멀티바이트 문자의 남은 조각은 버림
+    return data[:max_bytes].decode("utf-8", errors="ignore") + TRUNCATED_NOTE
+
+
+def _postprocess_body(text: str) -> str:
+    """parse_post 결과에 보일러플레이트 제거/공백 정리를 적용합니다.
+
+    글자 수가 MAX_MESSAGE_LEN(바이트)을 넘으면 UTF-8로도 반드시 넘으므로, 어차피 잘릴 뒷부분을 먼저 버리고
+    정리 정규식은 한도 길이만 훑게 합니다. (끝의 보일러플레이트는 함께 잘려 나가므로 제거 단계는 건너뜀)
+    """
+    if len(text) > MAX_MESSAGE_LEN:
+        logging.warning("본문이 너무 깁니다 (%d자). 정리 전에 자릅니다.", len(text))
+        return _normalize_spacing(text[:MAX_MESSAGE_LEN]) + TRUNCATED_NOTE
+    return _normalize_spacing(_strip_trailing_boilerplate(text))
+
+
 def _today_chat_thread() -> tuple[str, str]:
-    today = datetime.now(ZoneInfo("Asia/Seoul")).date()
+    today = _kst_today()
     title = f"🔮 {today.month}/{today.day} 오늘의 운세"
     thread_key = GCHAT_THREAD_KEY or f"horoscope_{today.strftime('%Y%m%d')}"
     return title, thread_key
@@ -485,10 +847,8 @@ def _strip_trailing_boilerplate(text: str) -> str:
     if not text:
         return text
     lines = text.rstrip().splitlines()
-    # 한글 보일러플레이트 시작 패턴(여러 케이스 보수적으로 포함)
-    pat = re.compile(r"^(이 게시물|이 글|출처|공유|댓글)", re.I)
     removed = False
-    while lines and pat.search(lines[-1].strip()):
+    while lines and _RE_BOILERPLATE_LINE.search(lines[-1].strip()):
         lines.pop()
         removed = True
     if removed:
@@ -497,9 +857,8 @@ def _strip_trailing_boilerplate(text: str) -> str:
 
     # 보수적으로: 마지막 문장(텍스트 끝)에 보일러플레이트가 붙어있는 경우 제거
     # 예: "... 이 게시물을 공유합니다." 같은 형태
-    tail_pattern = re.compile(r"(?:\s|^)(이 게시물을|이 글|출처|공유|댓글)[^\n]{0,200}\s*$", re.I)
-    if tail_pattern.search(text):
-        text = tail_pattern.sub("", text)
+    if _RE_BOILERPLATE_TAIL.search(text):
+        text = _RE_BOILERPLATE_TAIL.sub("", text)
         return text.rstrip()
 
     return text
@@ -552,23 +911,19 @@ def _normalize_spacing(text: str) -> str:
     out = "\n\n".join(paragraphs)
 
     # 4) 문장부호 앞 공백 제거, 마침표 후 하나의 공백 유지
-    out = re.sub(r"\s+([.,:;?!%])", r"\1", out)
-    out = re.sub(r"\.\s*([A-Za-z0-9가-힣])", r". \1", out)
+    out = _RE_PUNCT_WS.sub(r"\1", out)
+    out = _RE_PERIOD_WORD.sub(r". \1", out)
 
     # 5) '년생' 등에서 불필요한 공백 제거
-    out = re.sub(r"(\d)\s*,\s*(\d)", r"\1, \2", out)
-    out = re.sub(r"(\d)\s+년생", r"\1년생", out)
-    out = re.sub(r"(\d+)\s*월\s*(\d+)\s*일", r"\1월 \2일", out)
+    out = _RE_DIGIT_COMMA.sub(r"\1, \2", out)
+    out = _RE_NYEONSAENG_DATE.sub(_nyeonsaeng_date_fixup, out)
 
-    # 6) 괄호, 꺽쇠 주변 공백 정리
-    out = re.sub(r"\s*\(\s*", " (", out)
-    out = re.sub(r"\s*\)\s*", ") ", out)
-    out = re.sub(r"\s*〈\s*", " 〈", out)
-    out = re.sub(r"\s*〉\s*", "〉 ", out)
+    # 6) 괄호, 꺽쇠 주변 공백 정리 (여는 것은 앞에, 닫는 것은 뒤에 공백 하나)
+    out = _RE_PAREN_WS.sub(_bracket_fixup, out)
+    out = _RE_ANGLE_WS.sub(_bracket_fixup, out)
 
     # 마지막 공백/중복 공백 정리
-    out = re.sub(r"[ \t]{2,}", " ", out)
-    out = re.sub(r"\n{3,}", "\n\n", out)
+    out = _RE_SPACE_NL_RUNS.sub(_space_nl_fixup, out)
     return out.strip()
 
 def _format_jiyun_readable(text: str) -> str:
@@ -576,12 +931,10 @@ def _format_jiyun_readable(text: str) -> str:
     if not text:
         return text
     t = text.strip()
-    # 띠 구분(〈쥐띠〉 등) 앞에 단락을 넣어 가독성 개선
-    t = re.sub(r"\s*(〈[^〉]+〉)", r"\n\n\1", t)
-    # 운세지수(…%)를 각 띠의 끝으로 보이게
-    t = re.sub(r"\s*(운세지수\s*\d+%\.?)\s*", r" \1\n", t)
+    # 띠 구분(〈쥐띠〉 등) 앞에 단락을 넣고, 운세지수(…%)는 각 띠의 끝으로 보이게
+    t = _RE_JIYUN_BREAKS.sub(_jiyun_break_fixup, t)
     # 과도한 빈 줄 정리
-    t = re.sub(r"\n{3,}", "\n\n", t)
+    t = _RE_MULTI_NL.sub("\n\n", t)
     return t.strip()
 
 
@@ -609,10 +962,14 @@ def main(argv=None):
     logging.info("시작: 오늘의 운세 전송 (%s)", which)
 
     # robots 체크 (선택) — 개인용이라면 실패 시에도 계속 진행하도록 True 반환
-    if which in ("both", "mk") and not allowed_by_robots(SEARCH_URL, MK_BASE):
-        logging.warning("robots.txt에서 크롤링을 금지했을 가능성이 있습니다. 계속 진행하려면 코드를 수정하세요.")
-    if which in ("both", "jiyun") and not allowed_by_robots(ASKJIYUN_TODAY_LIST_URL, BASE):
-        logging.warning("robots.txt에서 크롤링을 금지했을 가능성이 있습니다. 계속 진행하려면 코드를 수정하세요.")
+    # 결과는 경고에만 쓰이므로 목록 페이지 요청과 겹쳐서 돌리고, 목록에서 글을 찾은 뒤 확인한다
+    robots_ex = ThreadPoolExecutor(max_workers=2)
+    mk_robots = robots_ex.submit(allowed_by_robots, SEARCH_URL, MK_BASE) if which in ("both", "mk") else None
+    jiyun_robots = (
+        robots_ex.submit(allowed_by_robots, ASKJIYUN_TODAY_LIST_URL, BASE) if which in ("both", "jiyun") else None
+    )
+    # 새 작업만 막는다 (이미 넣은 체크는 계속 실행됨)
+    robots_ex.shutdown(wait=False)
 
     jobs = []
     mk_job = None
@@ -620,20 +977,16 @@ def main(argv=None):
 
     if which in ("both", "mk"):
         post_url = find_today_post_url()
+        _warn_if_robots_disallowed(mk_robots)
         logging.info("MK 게시글 URL: %s", post_url)
 
-        html = http_get(post_url, headers=MK_HEADERS, timeout=MK_TIMEOUT, retry=MK_RETRY)
-        soup = BeautifulSoup(html, "html.parser")
-
-        page_title = None
-        og = soup.select_one('meta[property="og:title"]')
-        if og and og.get("content"):
-            page_title = og.get("content").strip()
-        if not page_title:
-            page_title = (soup.find("title").get_text(strip=True) if soup.find("title") else TITLE_PREFIX)
+        html = http_get_cached(post_url, "mk")
+        # 게시글은 한 번만 파싱해서 제목/이미지/본문 추출에 같이 쓴다
+        soup = BeautifulSoup(html, HTML_PARSER, from_encoding=HTML_ENCODING)
+        page_title = _extract_page_title(html, TITLE_PREFIX, prefer_og=True, soup=soup)
 
         # 주말 합본 글(제목에 날짜 2개) 처리
-        now = datetime.now(ZoneInfo("Asia/Seoul")).date()
+        now = _kst_today()
         title_dates = _extract_dates_from_title(page_title)
         if SKIP_MK_WEEKEND_DUPLICATE and len(title_dates) >= 2 and now in title_dates and now != title_dates[0]:
             logging.info(
@@ -643,13 +996,12 @@ def main(argv=None):
             )
             mk_job = None
         else:
-            image_urls = extract_mk_images(html, post_url)
+            image_urls = extract_mk_images(soup, post_url)
             # 본문이 이미지로만 구성되기도 함(MK는 자주 이미지 2장). 이 경우 텍스트 파싱은 잡음이 많아 제외.
             if image_urls:
                 message = ""
             else:
-                mk_text = parse_post(html)
-                mk_text = _normalize_spacing(_strip_trailing_boilerplate(mk_text))
+                mk_text = _postprocess_body(parse_post(soup, raw_html=html))
                 message = f"🔮 {page_title}\n{post_url}\n\n{mk_text}".strip()
             mk_job = {
                 "title": page_title,
@@ -661,19 +1013,14 @@ def main(argv=None):
     if which in ("both", "jiyun"):
         try:
             post_url = find_askjiyun_today_post_url()
+            _warn_if_robots_disallowed(jiyun_robots)
             logging.info("askjiyun 게시글 URL: %s", post_url)
 
-            html = http_get(
-                post_url,
-                headers=ASKJIYUN_HEADERS,
-                timeout=(ASKJIYUN_CONNECT_TIMEOUT, ASKJIYUN_READ_TIMEOUT),
-                retry=ASKJIYUN_RETRY,
-            )
-            soup = BeautifulSoup(html, "html.parser")
-            page_title = (soup.find("title").get_text(strip=True) if soup.find("title") else "askjiyun 오늘의 운세")
+            html = http_get_cached(post_url, "askjiyun")
+            soup = BeautifulSoup(html, HTML_PARSER, from_encoding=HTML_ENCODING)
+            page_title = _extract_page_title(html, "askjiyun 오늘의 운세", soup=soup)
             # 본문 파싱/정리
-            text = parse_post(html)
-            text = _normalize_spacing(_strip_trailing_boilerplate(text))
+            text = _postprocess_body(parse_post(soup, raw_html=html))
             text = _format_jiyun_readable(text)
             message = f"🔮 {page_title}\n{post_url}\n\n{text}".strip()
             jiyun_job = {
@@ -729,9 +1076,7 @@ def main(argv=None):
 
     # 길이 제한 처리(각 메시지별)
     for j in jobs:
-        if len(j["message"]) > MAX_MESSAGE_LEN:
-            logging.warning("메시지가 너무 깁니다 (%d자). 자릅니다.", len(j["message"]))
-            j["message"] = j["message"][:MAX_MESSAGE_LEN] + "\n\n(메시지가 길어 일부만 전송됩니다. 원문에서 전체 확인하세요.)"
+        j["message"] = _truncate_utf8(j["message"], MAX_MESSAGE_LEN)
 
     if args.dry_run:
         logging.info("Dry-run: 웹훅 전송을 건너뜁니다. 출력으로 대신합니다.")